@@ -11,10 +11,119 @@ import argparse
 import shutil
 import tempfile
 import os
+import queue
+import re
 import xml.etree.ElementTree as ET
 import datetime
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Any, Callable, Iterable, Iterator, List, Dict, NamedTuple, Sequence, Tuple, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    # orjsonが未導入の場合は標準のjsonモジュールで処理する
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    # ijsonが未導入の場合はJSON全体を読み込んで処理する
+    ijson = None
+
+# winget showの同時実行数（プロセス・ハンドルの枯渇を防ぐため上限を設ける）
+WINGET_SHOW_MAX_WORKERS = 8
+
+# 共有のPowerShellプロセスで実行するスクリプト1回あたりのタイムアウト（秒）
+POWERSHELL_TIMEOUT = 600
+
+# PowerShell経由のコマンド確認結果の有効期間（秒）
+TOOL_PROBE_TTL = 24 * 60 * 60
+
+# winget showの検索結果行の接頭語（表示言語ごと）
+WINGET_SHOW_PREFIXES = ("見つかりました", "Found")
+
+# "見つかりました AppName [PackageId]" または "Found AppName [PackageId]" の形式から AppName と PackageId を取得
+# 接頭語のみを除去し（日本語表示名は保持）、接頭語がない場合は行全体を表示名として使用
+WINGET_SHOW_NAME_PATTERN = re.compile(
+    r"^[ \t]*(?:(?:" + "|".join(map(re.escape, WINGET_SHOW_PREFIXES)) + r")[ \t]+)?(?P<name>[^\r\n]*?)[ \t]*\[(?P<id>[^\]\r\n]+)\][ \t\r]*$",
+    re.MULTILINE,
+)
+
+# PackageIDの末尾をそのまま表示名として使える形式（例: Mozilla.Firefox の Firefox）
+HEURISTIC_NAME_PATTERN = re.compile(r"^[A-Z][A-Za-z0-9]{2,}$")
+
+# 製品名ではなくエディションやチャネルを表すため、表示名の推測に使わないPackageIDの末尾
+HEURISTIC_EXCLUDED_TAILS = {"Community", "Preview", "Insiders", "Beta", "Dev", "Canary", "Nightly", "ESR", "Portable", "LTS", "Stable"}
+
+# winget showの出力のうち表示名を検索する先頭部分の文字数
+WINGET_SHOW_HEAD_LENGTH = 1024
+
+# winget表示名キャッシュの有効期間
+CACHE_TTL = datetime.timedelta(days=30)
+
+# キャッシュファイルの行数がエントリ数のこの倍数を超えたら重複を除いて書き直す
+CACHE_COMPACT_RATIO = 2
+
+# キャッシュファイルの読み書きを直列化するためのロック
+_cache_lock = threading.Lock()
+
+# 並列実行中のエクスポーターの出力を、エクスポーターごとにまとめて表示するためのバッファ
+_log_buffer = threading.local()
+
+# 並列実行中の全エクスポーターを通したwinget showの同時実行数の上限
+_winget_show_semaphore = threading.BoundedSemaphore(WINGET_SHOW_MAX_WORKERS)
+
+
+class WingetApp(NamedTuple):
+    """Microsoft Store / Winget アプリの情報（CSVの列順）"""
+
+    package_id: str
+    name: str
+    version: str
+
+
+class ScoopApp(NamedTuple):
+    """Scoop アプリの情報（CSVの列順）"""
+
+    name: str
+    version: str
+    source: str
+
+
+class ChocolateyApp(NamedTuple):
+    """Chocolatey アプリの情報（CSVの列順）"""
+
+    package_id: str
+    title: str
+    version: str
+
+
+def log(message: str):
+    """進捗メッセージを出力（エクスポーターの並列実行中はバッファに溜める）"""
+    lines = getattr(_log_buffer, "lines", None)
+    if lines is not None:
+        lines.append(message)
+    else:
+        print(message)
+
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    """JSONを解析（orjsonが利用可能な場合は高速な実装を使用）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj: Any) -> bytes:
+    """JSONをUTF-8のバイト列として1行で出力（orjsonが利用可能な場合は高速な実装を使用）"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode("utf-8")
 
 
 def run_command(cmd: List[str]) -> Tuple[str, str, int]:
@@ -33,18 +142,155 @@ def run_command(cmd: List[str]) -> Tuple[str, str, int]:
         return "", str(e), 1
 
 
-def is_command_available(command: str) -> bool:
-    """コマンドが利用可能かチェック"""
+class PowerShellNotRunningError(RuntimeError):
+    """共有のPowerShellプロセスがスクリプトの送信前に終了していた場合の例外"""
+
+
+class PowerShellHost:
+    """PowerShellプロセスを1つだけ起動し、複数のスクリプト実行で使い回す"""
+
+    END_MARKER = "<<<END_OF_SCRIPT>>>"
+
+    _shared: Optional["PowerShellHost"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, timeout: float = POWERSHELL_TIMEOUT):
+        # -NoProfileでプロファイルの読み込みを省略し、起動時間を短縮する
+        self.process = subprocess.Popen(  # pylint: disable=consider-using-with
+            ["powershell", "-NoProfile", "-NoLogo", "-NonInteractive", "-Command", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+        )
+        if self.process.stdin is None or self.process.stdout is None:
+            self.process.kill()
+            raise RuntimeError("PowerShell pipes are not available")
+        self.stdin = self.process.stdin
+        self.stdout = self.process.stdout
+        self.lock = threading.Lock()
+
+        # 標準出力はタイムアウト付きで読めるよう別スレッドで行単位に受け取る
+        self.lines: "queue.Queue[str]" = queue.Queue()
+        threading.Thread(target=self._read_stdout, daemon=True).start()
+
+        # 初期化も呼び出し元のタイムアウトで打ち切る
+        _, stderr, returncode = self.run("[Console]::OutputEncoding = [System.Text.Encoding]::UTF8", timeout)
+        if returncode != 0:
+            self.process.kill()
+            raise RuntimeError(f"PowerShell initialization failed: {stderr}")
+
+    def _read_stdout(self):
+        for line in self.stdout:
+            self.lines.put(line)
+        # プロセス終了を通知
+        self.lines.put("")
+
+    def run(self, script: str, timeout: float = POWERSHELL_TIMEOUT) -> Tuple[str, str, int]:
+        """
+        スクリプトを実行して出力をキャプチャ
+
+        Returns:
+            Tuple[stdout, stderr, returncode]
+        """
+        with self.lock:
+            if self.process.poll() is not None:
+                raise PowerShellNotRunningError("PowerShell process is not running")
+
+            # 終了マーカーと終了コードを出力させ、そこまでを1回分の出力とする
+            # スクリプトが例外で中断されてもマーカーが出力されるようfinallyで出力する
+            self.stdin.write(
+                f"$global:LASTEXITCODE = 0; $ok = $false; try {{ {script}; $ok = $? }} "
+                f"finally {{ Write-Output ('{self.END_MARKER}' + $(if ($ok) {{ $global:LASTEXITCODE }} else {{ 1 }})) }}\n"
+            )
+            self.stdin.flush()
+
+            output = []
+            while True:
+                try:
+                    line = self.lines.get(timeout=timeout)
+                except queue.Empty:
+                    # 出力の区切りが分からなくなるため、プロセスごと終了する
+                    self.process.kill()
+                    self.process.wait()
+                    return "", "PowerShell script timed out", 1
+
+                if not line:
+                    return "".join(output), "PowerShell process exited", 1
+
+                if line.startswith(self.END_MARKER):
+                    returncode = line[len(self.END_MARKER) :].strip()
+                    return "".join(output), "", int(returncode) if returncode.lstrip("-").isdigit() else 1
+
+                output.append(line)
+
+    def close(self):
+        """PowerShellプロセスを終了"""
+        try:
+            self.stdin.write("exit\n")
+            self.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.process.kill()
+
+    @classmethod
+    def shared(cls, timeout: float = POWERSHELL_TIMEOUT) -> "PowerShellHost":
+        """共有のPowerShellプロセスを取得（未起動または終了済みの場合はtimeout以内で起動）"""
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared.process.poll() is not None:
+                cls._shared = cls(timeout)
+            return cls._shared
+
+    @classmethod
+    def close_shared(cls):
+        """共有のPowerShellプロセスが起動していれば終了"""
+        with cls._shared_lock:
+            if cls._shared is not None:
+                cls._shared.close()
+                cls._shared = None
+
+
+def run_powershell(script: str, timeout: float = POWERSHELL_TIMEOUT) -> Tuple[str, str, int]:
+    """
+    共有のPowerShellプロセスでスクリプトを実行して出力をキャプチャ
+
+    Returns:
+        Tuple[stdout, stderr, returncode]
+    """
+    try:
+        try:
+            return PowerShellHost.shared(timeout).run(script, timeout)
+        except PowerShellNotRunningError:
+            # 待機中に他のスクリプトのタイムアウトでプロセスが終了した場合は、新しいプロセスで1回だけ再実行
+            return PowerShellHost.shared(timeout).run(script, timeout)
+    except FileNotFoundError:
+        return "", "Command not found: powershell", 1
+    except Exception as e:
+        return "", str(e), 1
+
+
+def is_command_available(command: str, probe_cache: Optional[Dict[str, Dict]] = None) -> bool:
+    """コマンドが利用可能かチェック（PowerShell経由の確認結果はprobe_cacheに保持）"""
     result = shutil.which(command) is not None
 
     # Scoopの場合、CMDシムファイルが見つかってもsubprocessで実行できない場合があるため
     # PowerShell経由でテストする
     if command == "scoop" and result:
-        try:
-            test_result = subprocess.run(["powershell", "-Command", "scoop --version"], capture_output=True, text=True, timeout=10)
-            return test_result.returncode == 0
-        except Exception:
-            return False
+        # 有効期限内の確認結果があればPowerShellの起動を省略
+        if probe_cache is not None:
+            # 想定外の形式のエントリはキャッシュなしとして扱う
+            cached_probe = probe_cache.get(command)
+            if isinstance(cached_probe, dict) and isinstance(cached_probe.get("ts"), (int, float)):
+                if time.time() - cached_probe["ts"] < TOOL_PROBE_TTL:
+                    return cached_probe.get("ok") is True
+
+        _, _, returncode = run_powershell("scoop --version", timeout=10)
+        result = returncode == 0
+
+        if probe_cache is not None:
+            probe_cache[command] = {"ts": time.time(), "ok": result}
 
     return result
 
@@ -56,83 +302,224 @@ def get_cache_dir(output_dir: Path) -> Path:
     return cache_dir
 
 
+def get_tool_probe_file(cache_dir: Path) -> Path:
+    """コマンド確認結果のキャッシュファイルのパスを取得"""
+    return cache_dir / "tool_probes.json"
+
+
+def load_tool_probes(cache_dir: Path) -> Dict[str, Dict]:
+    """コマンド確認結果のキャッシュを読み込み"""
+    probe_file = get_tool_probe_file(cache_dir)
+
+    if not probe_file.exists():
+        return {}
+
+    try:
+        with open(probe_file, "rb") as f:
+            probe_cache = json_loads(f.read())
+
+        # 想定外の形式の場合は破損とみなす
+        return probe_cache if isinstance(probe_cache, dict) else {}
+    except Exception:
+        # キャッシュファイルが破損している場合は空の辞書を返す
+        return {}
+
+
+def save_tool_probes(cache_dir: Path, probe_cache: Dict[str, Dict]):
+    """コマンド確認結果のキャッシュを保存"""
+    try:
+        with open(get_tool_probe_file(cache_dir), "wb") as f:
+            f.write(json_dumps(probe_cache))
+    except Exception as e:
+        print(f"Warning: コマンド確認結果の保存に失敗: {e}")
+
+
+@contextmanager
+def scratch_file(cache_dir: Optional[Path], filename: str) -> Iterator[str]:
+    """
+    エクスポート結果を書き出す作業ファイルのパスを提供
+
+    キャッシュディレクトリ内の作業ファイルは実行ごとに使い回し、削除はmainの終了時にまとめて行う。
+    キャッシュ無効時は一時ファイルを作成し、使用後に削除する。
+    """
+    if cache_dir:
+        scratch_path = cache_dir / f"scratch_{filename}"
+        # 中断された前回の実行で残ったファイルを今回の結果として読まないよう、先に削除しておく
+        scratch_path.unlink(missing_ok=True)
+        yield str(scratch_path)
+        return
+
+    temp_fd, temp_path = tempfile.mkstemp(suffix=Path(filename).suffix, text=True)
+    os.close(temp_fd)
+    try:
+        yield temp_path
+    finally:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+def remove_scratch_files(cache_dir: Path):
+    """エクスポートの作業ファイルを削除"""
+    for scratch_path in cache_dir.glob("scratch_*"):
+        try:
+            scratch_path.unlink()
+        except OSError as e:
+            print(f"Warning: 作業ファイルの削除に失敗 {scratch_path}: {e}")
+
+
 def get_cache_file(cache_dir: Path) -> Path:
-    """キャッシュファイルのパスを取得"""
+    """キャッシュファイル（JSON Lines形式）のパスを取得"""
+    return cache_dir / "winget_cache.jsonl"
+
+
+def get_legacy_cache_file(cache_dir: Path) -> Path:
+    """旧形式（JSON）のキャッシュファイルのパスを取得"""
     return cache_dir / "winget_cache.json"
 
 
+def write_cache_entries(cache_file: Path, entries: Iterable[Dict], mode: str):
+    """キャッシュエントリを1行1件で書き出し（呼び出し側で_cache_lockを保持すること）"""
+    with open(cache_file, mode + "b") as f:
+        for entry in entries:
+            f.write(json_dumps(entry) + b"\n")
+
+
+def load_legacy_cached_winget_info(cache_dir: Path) -> Dict[str, Dict]:
+    """旧形式のキャッシュを読み込み、JSON Lines形式へ移行"""
+    legacy_file = get_legacy_cache_file(cache_dir)
+
+    if not legacy_file.exists():
+        return {}
+
+    try:
+        with open(legacy_file, "rb") as f:
+            all_cache = json_loads(f.read())
+
+        with _cache_lock:
+            write_cache_entries(get_cache_file(cache_dir), all_cache.values(), "w")
+        return all_cache
+    except Exception:
+        # キャッシュファイルが破損している場合は空の辞書を返す
+        return {}
+
+
 def load_all_cached_winget_info(cache_dir: Path) -> Dict[str, Dict]:
-    """全キャッシュデータを読み込み"""
+    """全キャッシュデータを読み込み（同じpackage_idの行は後のものを優先）"""
     cache_file = get_cache_file(cache_dir)
 
     if not cache_file.exists():
-        return {}
+        return load_legacy_cached_winget_info(cache_dir)
+
+    all_cache: Dict[str, Dict] = {}
+    line_count = 0
 
     try:
-        with open(cache_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        with _cache_lock:
+            with open(cache_file, "rb") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    line_count += 1
+
+                    try:
+                        entry = json_loads(line)
+                    except ValueError:
+                        # 書き込み途中で中断された行などは読み飛ばす
+                        continue
+
+                    if isinstance(entry, dict) and entry.get("package_id"):
+                        all_cache[entry["package_id"]] = entry
+
+            # 追記により重複行が増えた場合は最新のエントリのみで書き直す
+            if line_count > CACHE_COMPACT_RATIO * len(all_cache):
+                write_cache_entries(cache_file, all_cache.values(), "w")
+
     except Exception:
         # キャッシュファイルが破損している場合は空の辞書を返す
         return {}
 
+    return all_cache
 
-def load_cached_winget_info(cache_dir: Path, package_id: str) -> Optional[Dict]:
-    """キャッシュから特定のpackage_idの情報を読み込み"""
-    all_cache = load_all_cached_winget_info(cache_dir)
-    return all_cache.get(package_id)
 
+def build_cache_entry(package_id: str, display_name: str, version: str, source: str) -> Dict[str, str]:
+    """キャッシュに保存するエントリを作成（必要最小限のデータと表示名の取得元のみ）"""
+    return {
+        "package_id": package_id,
+        "version": version,
+        "cached_at": datetime.datetime.now().isoformat(),
+        "display_name": display_name,
+        "source": source,
+    }
 
-def save_winget_info_to_cache(cache_dir: Path, package_id: str, display_name: str):
-    """winget show情報をキャッシュに保存（軽量版）"""
-    cache_file = get_cache_file(cache_dir)
+
+def is_cache_entry_valid(entry: Optional[Dict], version: str) -> bool:
+    """キャッシュエントリが同じバージョンのもので、表示名を持ち、有効期間内かチェック"""
+    if not entry or entry.get("version") != version or not isinstance(entry.get("display_name"), str):
+        return False
 
     try:
-        # 既存のキャッシュデータを読み込み
-        all_cache = load_all_cached_winget_info(cache_dir)
+        cached_at = datetime.datetime.fromisoformat(entry.get("cached_at", ""))
+    except (TypeError, ValueError):
+        return False
+
+    return datetime.datetime.now() - cached_at < CACHE_TTL
+
 
-        # 新しい情報を追加（必要最小限のデータのみ）
-        all_cache[package_id] = {"package_id": package_id, "cached_at": datetime.datetime.now().isoformat(), "display_name": display_name}
+def flush_cache(cache_dir: Path, entries: List[Dict]):
+    """新しく取得したキャッシュエントリをまとめてファイルに追記"""
+    if not entries:
+        return
 
-        # ファイルに書き戻し
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(all_cache, f, ensure_ascii=False, indent=2)
+    try:
+        # 複数ソースからの書き出しが交錯しないようロックする
+        with _cache_lock:
+            write_cache_entries(get_cache_file(cache_dir), entries, "a")
 
     except Exception as e:
-        print(f"    Warning: キャッシュの保存に失敗 {package_id}: {e}")
+        log(f"    Warning: キャッシュの保存に失敗: {e}")
+
+
+def parse_winget_show_name(stdout: str, package_id: str) -> str:
+    """winget showの出力から表示名を抽出（見つからない場合は空文字列）"""
+    # 表示名は出力の先頭数行にあるため、先頭部分のみを検索する
+    for match in WINGET_SHOW_NAME_PATTERN.finditer(stdout, 0, WINGET_SHOW_HEAD_LENGTH):
+        if match.group("id") == package_id:
+            return match.group("name")
+
+    return ""
 
 
-def get_app_display_name(package_id: str, cache_dir: Optional[Path] = None) -> str:
+def guess_display_name_from_id(package_id: str) -> Optional[str]:
+    """PackageIDの末尾がそのまま表示名として使える形式であれば返す（例: Mozilla.Firefox -> Firefox）"""
+    # Publisher.Product形式（ドット区切りで2要素）のPackageIDのみを対象にする
+    if package_id.count(".") != 1:
+        return None
+
+    tail = package_id.rsplit(".", 1)[-1]
+    if tail in HEURISTIC_EXCLUDED_TAILS:
+        return None
+
+    return tail if HEURISTIC_NAME_PATTERN.match(tail) else None
+
+
+def get_app_display_name(package_id: str, cache_dict: Optional[Dict[str, Dict]] = None, version: str = "latest") -> str:
     """winget showで正確な表示名を取得（キャッシュ機能付き）"""
 
     # キャッシュが有効な場合は、まずキャッシュから検索
-    if cache_dir:
-        cached_info = load_cached_winget_info(cache_dir, package_id)
-        if cached_info:
+    if cache_dict is not None:
+        cached_info = cache_dict.get(package_id)
+        if cached_info is not None and is_cache_entry_valid(cached_info, version):
             return cached_info.get("display_name", "")
 
     # キャッシュにない場合はwinget showを実行
     display_name = ""
 
     try:
-        stdout, _, returncode = run_command(["winget", "show", package_id, "--disable-interactivity"])
+        with _winget_show_semaphore:
+            stdout, _, returncode = run_command(["winget", "show", package_id, "--disable-interactivity"])
 
         if returncode == 0 and stdout:
-            # 最初の行から表示名を抽出
-            for line in stdout.split("\n"):
-                line = line.strip()
-                if f"[{package_id}]" in line:
-                    # "見つかりました AppName [PackageId]" または "Found AppName [PackageId]" の形式から AppName を取得
-                    before_bracket = line.split(f"[{package_id}]")[0].strip()
-
-                    # 検索結果の接頭語のみを除去（日本語表示名は保持）
-                    if before_bracket.startswith("見つかりました "):
-                        display_name = before_bracket[len("見つかりました ") :].strip()
-                    elif before_bracket.startswith("Found "):
-                        display_name = before_bracket[len("Found ") :].strip()
-                    else:
-                        # その他の場合は全体を表示名として使用
-                        display_name = before_bracket.strip()
-                    break
+            display_name = parse_winget_show_name(stdout, package_id)
     except Exception:
         # エラーが発生した場合はそのまま継続
         pass
@@ -141,104 +528,158 @@ def get_app_display_name(package_id: str, cache_dir: Optional[Path] = None) -> s
     if not display_name:
         display_name = package_id.split(".")[-1] if "." in package_id else package_id
 
-    # キャッシュに保存（表示名のみ）
-    if cache_dir:
-        save_winget_info_to_cache(cache_dir, package_id, display_name)
+    # メモリ上のキャッシュに保存（表示名のみ、ファイルへの書き出しは呼び出し元でまとめて行う）
+    if cache_dict is not None:
+        cache_dict[package_id] = build_cache_entry(package_id, display_name, version, "winget show")
 
     return display_name
 
 
-def get_winget_source_apps(source: str, source_name: str, cache_dir: Optional[Path] = None) -> List[Dict[str, str]]:
-    """指定されたwingetソースからアプリの情報を取得（winget exportを使用）"""
-    print(f"{source_name}アプリを処理中...")
+def get_winget_package_names(source: str) -> Dict[str, str]:
+    """Get-WinGetPackage（Microsoft.WinGet.Clientモジュール）で表示名を1回の呼び出しで一括取得"""
+    stdout, _, returncode = run_powershell(
+        f"Import-Module Microsoft.WinGet.Client; Get-WinGetPackage -Source {source} | Select-Object Id,Name,Version | ConvertTo-Json -Depth 3"
+    )
 
-    apps = []
+    # モジュール未導入などで取得できない場合は空の辞書を返す（呼び出し元でwinget showにフォールバック）
+    if returncode != 0 or not stdout.strip():
+        return {}
 
     try:
-        # 一時ファイルを作成
-        temp_fd, temp_path = tempfile.mkstemp(suffix=".json", text=True)
-        os.close(temp_fd)
-
-        # winget export実行
-        _, _, returncode = run_command(["winget", "export", "-s", source, "-o", temp_path, "--disable-interactivity", "--include-versions"])
-
-        if returncode == 0 and os.path.exists(temp_path):
-            with open(temp_path, "r", encoding="utf-8") as f:
-                json_data = json.load(f)
-
-            packages = []
-            if "Sources" in json_data:
-                for source_data in json_data["Sources"]:
-                    if "Packages" in source_data:
-                        packages = source_data["Packages"]
-                        break
-
-            # キャッシュにないパッケージをリストアップ
-            packages_to_fetch = []
-            all_cache = load_all_cached_winget_info(cache_dir) if cache_dir else {}
-
-            for package in packages:
-                package_id = package.get("PackageIdentifier", "")
-                if package_id and package_id not in all_cache:
-                    packages_to_fetch.append(package_id)
-
-            fetch_count = len(packages_to_fetch)
-            if fetch_count > 0:
-                print(f"  → {fetch_count}個のパッケージでwinget showを実行中...")
-
-            fetch_index = 0
-            for package in packages:
-                package_id = package.get("PackageIdentifier", "")
-                version = package.get("Version", "latest")
-
-                if package_id:
-                    # キャッシュなしの場合のみ進捗表示
-                    if package_id in packages_to_fetch:
-                        fetch_index += 1
-                        print(f"    [{fetch_index}/{fetch_count}] {package_id}")
-
-                    # winget show で正確な表示名を取得（キャッシュ使用）
-                    name = get_app_display_name(package_id, cache_dir)
-
-                    apps.append({"PackageId": package_id, "Name": name, "Version": version})
-
-        # 一時ファイルを削除
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        json_data = json_loads(stdout)
+    except ValueError:
+        return {}
 
-    except Exception as e:
-        print(f"  Warning: winget export failed for {source}: {e}")
+    # パッケージが1件のみの場合は配列ではなく単体のオブジェクトが返される
+    if isinstance(json_data, dict):
+        json_data = [json_data]
+
+    return {package["Id"]: package["Name"] for package in json_data if package.get("Id") and package.get("Name")}
+
+
+def fetch_display_names(source: str, package_versions: Dict[str, str], cache_dict: Dict[str, Dict]):
+    """キャッシュにない（または古い）パッケージの表示名を取得し、package_idとバージョンの組でキャッシュに追加"""
+    # まずGet-WinGetPackageで一括取得し、取得できなかったものだけwinget showを実行
+    bulk_names = get_winget_package_names(source)
+    bulk_count = 0
+    for package_id, version in package_versions.items():
+        if package_id in bulk_names:
+            cache_dict[package_id] = build_cache_entry(package_id, bulk_names[package_id], version, "Get-WinGetPackage")
+            bulk_count += 1
+
+    if bulk_count > 0:
+        log(f"  → {bulk_count}個のパッケージの表示名をGet-WinGetPackageで取得")
+
+    packages_to_fetch = []
+    guessed_count = 0
+    for package_id, version in package_versions.items():
+        if package_id in bulk_names:
+            continue
+
+        # PackageIDから表示名が推測できるものはwinget showを実行しない
+        guessed_name = guess_display_name_from_id(package_id)
+        if guessed_name:
+            cache_dict[package_id] = build_cache_entry(package_id, guessed_name, version, "heuristic")
+            guessed_count += 1
+        else:
+            packages_to_fetch.append(package_id)
+
+    if guessed_count > 0:
+        log(f"  → {guessed_count}個のパッケージの表示名をPackageIDから推測")
+
+    fetch_count = len(packages_to_fetch)
+    if fetch_count == 0:
+        return
 
-    print(f"  → {len(apps)}個のアプリを検出")
-    return apps
+    log(f"  → {fetch_count}個のパッケージでwinget showを実行中...")
+
+    # winget showはサブプロセスの待ち時間が支配的なため並列に実行
+    with ThreadPoolExecutor(max_workers=WINGET_SHOW_MAX_WORKERS) as executor:
+        futures = {executor.submit(get_app_display_name, package_id, cache_dict, package_versions[package_id]): package_id for package_id in packages_to_fetch}
+        for fetch_index, future in enumerate(as_completed(futures), start=1):
+            future.result()
+            log(f"    [{fetch_index}/{fetch_count}] {futures[future]}")
+
+
+def read_winget_export_packages(export_path: str) -> Iterator[Tuple[str, str]]:
+    """winget exportの出力から(PackageIdentifier, Version)を順に取得"""
+    with open(export_path, "rb") as f:
+        if ijson is not None:
+            # 必要な2項目以外の辞書ツリーを構築しないよう、パッケージ単位でストリーム解析
+            package_items = ijson.items(f, "Sources.item.Packages.item")
+        else:
+            json_data = json_loads(f.read())
+            package_items = (package for source_data in json_data.get("Sources", []) for package in source_data.get("Packages", []))
+
+        for package in package_items:
+            package_id = package.get("PackageIdentifier", "")
+            if package_id:
+                yield package_id, package.get("Version", "latest")
 
 
-def get_microsoft_store_apps(cache_dir: Optional[Path] = None) -> List[Dict[str, str]]:
-    """Microsoft Store アプリの情報を取得（winget exportを使用）"""
-    return get_winget_source_apps("msstore", "Microsoft Store", cache_dir)
+def get_winget_source_apps(source: str, source_name: str, cache_dir: Optional[Path] = None) -> List[WingetApp]:
+    """指定されたwingetソースからアプリの情報を取得（winget exportを使用）"""
+    log(f"{source_name}アプリを処理中...")
+
+    apps: List[WingetApp] = []
+
+    # キャッシュは1回だけ読み込み、メモリ上で更新する
+    all_cache = load_all_cached_winget_info(cache_dir) if cache_dir else {}
+    loaded_cache = dict(all_cache)
+
+    try:
+        with scratch_file(cache_dir, f"winget_{source}.json") as scratch_path:
+            # winget export実行
+            _, _, returncode = run_command(["winget", "export", "-s", source, "-o", scratch_path, "--disable-interactivity", "--include-versions"])
+
+            exported = returncode == 0 and os.path.exists(scratch_path)
+            packages = list(read_winget_export_packages(scratch_path)) if exported else []
+
+        if exported:
+            # 1回の走査でアプリ一覧を作成し、キャッシュにないものだけ後から表示名を埋める
+            missing_indexes = []
+
+            for package_id, version in packages:
+                # メモリ上のキャッシュから表示名を取得（ディスクアクセスなし）
+                # バージョンが変わった、または有効期間を過ぎたエントリは取得し直す
+                cached_info = all_cache.get(package_id)
+                if cached_info is not None and is_cache_entry_valid(cached_info, version):
+                    apps.append(WingetApp(package_id, cached_info["display_name"], version))
+                else:
+                    missing_indexes.append(len(apps))
+                    apps.append(WingetApp(package_id, "", version))
+
+            # キャッシュにないパッケージの表示名を取得してキャッシュに追加
+            if missing_indexes:
+                fetch_display_names(source, {apps[index].package_id: apps[index].version for index in missing_indexes}, all_cache)
+
+                for index in missing_indexes:
+                    apps[index] = apps[index]._replace(name=get_app_display_name(apps[index].package_id, all_cache, apps[index].version))
 
+    except Exception as e:
+        log(f"  Warning: winget export failed for {source}: {e}")
+
+    finally:
+        # 新しく取得した表示名のみをまとめて1回だけ追記
+        if cache_dir:
+            flush_cache(cache_dir, [entry for package_id, entry in all_cache.items() if loaded_cache.get(package_id) is not entry])
 
-def get_winget_apps(cache_dir: Optional[Path] = None) -> List[Dict[str, str]]:
-    """Winget アプリの情報を取得（winget exportを使用）"""
-    return get_winget_source_apps("winget", "Winget", cache_dir)
+    log(f"  → {len(apps)}個のアプリを検出")
+    return apps
 
 
-def get_scoop_apps() -> List[Dict[str, str]]:
+def get_scoop_apps() -> List[ScoopApp]:
     """Scoop アプリの情報を取得（scoop exportを使用）"""
-    print("Scoopアプリを処理中...")
+    log("Scoopアプリを処理中...")
 
     apps = []
 
     try:
-        # 一時ファイルを作成
-        temp_fd, temp_path = tempfile.mkstemp(suffix=".json", text=True)
-        os.close(temp_fd)
-
         # scoop export実行（直接標準出力からJSONを取得）
-        stdout, _, returncode = run_command(["powershell", "-Command", "scoop export"])
+        stdout, _, returncode = run_powershell("scoop export")
 
         if returncode == 0 and stdout:
-            json_data = json.loads(stdout)
+            json_data = json_loads(stdout)
 
             if "apps" in json_data:
                 for app in json_data["apps"]:
@@ -247,69 +688,95 @@ def get_scoop_apps() -> List[Dict[str, str]]:
                     source = app.get("Source", "main")
 
                     if name:
-                        apps.append({"Name": name, "Version": version, "Source": source})
-
-        # 一時ファイルを削除
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+                        apps.append(ScoopApp(name, version, source))
 
     except Exception as e:
-        print(f"  Warning: scoop export failed: {e}")
+        log(f"  Warning: scoop export failed: {e}")
 
-    print(f"  → {len(apps)}個のアプリを検出")
+    log(f"  → {len(apps)}個のアプリを検出")
     return apps
 
 
-def get_chocolatey_apps() -> List[Dict[str, str]]:
+def get_chocolatey_apps(cache_dir: Optional[Path] = None) -> List[ChocolateyApp]:
     """Chocolatey アプリの情報を取得（choco exportを使用）"""
-    print("Chocolateyアプリを処理中...")
+    log("Chocolateyアプリを処理中...")
 
     apps = []
 
     try:
-        # 一時ファイルを作成
-        temp_fd, temp_path = tempfile.mkstemp(suffix=".config", text=True)
-        os.close(temp_fd)
-
-        # choco export実行
-        _, _, returncode = run_command(["choco", "export", temp_path, "--include-version-numbers"])
+        with scratch_file(cache_dir, "chocolatey.config") as scratch_path:
+            # choco export実行
+            _, _, returncode = run_command(["choco", "export", scratch_path, "--include-version-numbers"])
 
-        if returncode == 0 and os.path.exists(temp_path):
-            tree = ET.parse(temp_path)
-            root = tree.getroot()
+            if returncode == 0 and os.path.exists(scratch_path):
+                # DOM全体を構築せず、package要素ごとにストリーム解析
+                for _, element in ET.iterparse(scratch_path, events=("end",)):
+                    if element.tag != "package":
+                        continue
 
-            for package in root.findall("package"):
-                package_id = package.get("id", "")
-                version = package.get("version", "latest")
+                    package_id = element.get("id", "")
+                    version = element.get("version", "latest")
 
-                if package_id and not package_id.startswith("chocolatey"):
-                    apps.append({"PackageId": package_id, "Title": package_id, "Version": version})  # IDをタイトルとして使用
+                    if package_id and not package_id.startswith("chocolatey"):
+                        apps.append(ChocolateyApp(package_id, package_id, version))  # IDをタイトルとして使用
 
-        # 一時ファイルを削除
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+                    # 処理済みの要素を解放
+                    element.clear()
 
     except Exception as e:
-        print(f"  Warning: choco export failed: {e}")
+        log(f"  Warning: choco export failed: {e}")
 
-    print(f"  → {len(apps)}個のパッケージを検出")
+    log(f"  → {len(apps)}個のパッケージを検出")
     return apps
 
 
-def write_csv(filename, data: List[Dict[str, str]], fieldnames: List[str]):
+def write_csv(filename, data: Sequence[Tuple[str, ...]], fieldnames: List[str]):
     """データをCSVファイルに書き出し"""
     if not data:
         return
 
     try:
         with open(str(filename), "w", newline="", encoding="utf-8") as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+            # 各行はfieldnamesと同じ順序のタプルのため、そのまま一括で書き出す
+            writer = csv.writer(csvfile)
+            writer.writerow(fieldnames)
             writer.writerows(data)
     except Exception as e:
         print(f"  Error writing {filename}: {e}")
 
 
+class Exporter(NamedTuple):
+    """パッケージマネージャーごとの出力設定"""
+
+    command: str  # 利用可否を確認するコマンド
+    fetch: Callable[[Path], Sequence[Tuple[str, ...]]]  # キャッシュディレクトリを受け取りアプリ情報を返す
+    fieldnames: List[str]  # CSVのヘッダー（アプリ情報のタプルと同じ順序）
+    filename: str
+
+
+# 利用可否を確認するコマンドと表示名
+PACKAGE_MANAGERS = {"winget": "Winget", "scoop": "Scoop", "choco": "Chocolatey"}
+
+# 出力順に並べたエクスポーター一覧
+EXPORTERS = [
+    # Microsoft Store アプリ（wingetに依存）
+    Exporter("winget", partial(get_winget_source_apps, "msstore", "Microsoft Store"), ["PackageId", "Name", "Version"], "microsoft_store_apps.csv"),
+    Exporter("winget", partial(get_winget_source_apps, "winget", "Winget"), ["PackageId", "Name", "Version"], "winget_apps.csv"),
+    Exporter("scoop", lambda _: get_scoop_apps(), ["Name", "Version", "Source"], "scoop_apps.csv"),
+    Exporter("choco", get_chocolatey_apps, ["PackageId", "Title", "Version"], "chocolatey_apps.csv"),
+]
+
+
+def run_exporter(exporter: Exporter, cache_dir: Path) -> Tuple[List[str], Sequence[Tuple[str, ...]]]:
+    """エクスポーターを実行し、進捗メッセージとアプリ情報を返す（メッセージは呼び出し元で出力）"""
+    lines: List[str] = []
+    _log_buffer.lines = lines
+    try:
+        return lines, exporter.fetch(cache_dir)
+    finally:
+        _log_buffer.lines = None
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="各パッケージマネージャーからインストール済みアプリの情報をCSVで出力",
@@ -349,51 +816,42 @@ Chocolatey:
     # 各パッケージマネージャーの確認
     print("各パッケージマネージャーの確認中...")
 
-    winget_available = is_command_available("winget")
-    scoop_available = is_command_available("scoop")
-    choco_available = is_command_available("choco")
+    probe_cache = load_tool_probes(cache_dir)
+    cached_probes = dict(probe_cache)
 
-    print(f"Winget: {'インストール済み' if winget_available else '未インストール'}")
-    print(f"Scoop: {'インストール済み' if scoop_available else '未インストール'}")
-    print(f"Chocolatey: {'インストール済み' if choco_available else '未インストール'}")
-    print()
+    available = {command: is_command_available(command, probe_cache) for command in PACKAGE_MANAGERS}
 
-    # Microsoft Store アプリ（wingetに依存）
-    if winget_available:
-        ms_store_apps = get_microsoft_store_apps(cache_dir)
-        if ms_store_apps:
-            write_csv(
-                output_dir / "microsoft_store_apps.csv",
-                ms_store_apps,
-                ["PackageId", "Name", "Version"],
-            )
+    # PowerShell経由で確認し直した場合のみ保存
+    if probe_cache != cached_probes:
+        save_tool_probes(cache_dir, probe_cache)
+
+    for command, label in PACKAGE_MANAGERS.items():
+        print(f"{label}: {'インストール済み' if available[command] else '未インストール'}")
+    print()
 
-    # Winget アプリ
-    if winget_available:
-        winget_apps = get_winget_apps(cache_dir)
-        if winget_apps:
-            write_csv(output_dir / "winget_apps.csv", winget_apps, ["PackageId", "Name", "Version"])
+    # 各パッケージマネージャーは互いに独立しているため、利用可能なものを並列に処理
+    jobs = [exporter for exporter in EXPORTERS if available[exporter.command]]
+    if jobs:
+        with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+            # 結果はEXPORTERSの順に受け取り、進捗メッセージの出力とCSVの書き出しはメインスレッドで行う
+            for exporter, (lines, apps) in zip(jobs, executor.map(partial(run_exporter, cache_dir=cache_dir), jobs)):
+                print("\n".join(lines), flush=True)
+                if apps:
+                    write_csv(output_dir / exporter.filename, apps, exporter.fieldnames)
 
-    # Scoop アプリ
-    if scoop_available:
-        scoop_apps = get_scoop_apps()
-        if scoop_apps:
-            write_csv(output_dir / "scoop_apps.csv", scoop_apps, ["Name", "Version", "Source"])
+    # 共有のPowerShellプロセスを終了
+    PowerShellHost.close_shared()
 
-    # Chocolatey アプリ
-    if choco_available:
-        choco_apps = get_chocolatey_apps()
-        if choco_apps:
-            write_csv(output_dir / "chocolatey_apps.csv", choco_apps, ["PackageId", "Title", "Version"])
+    # エクスポートの作業ファイルを削除
+    remove_scratch_files(cache_dir)
 
     print()
     print("処理完了")
     print("出力されたファイル:")
 
-    csv_files = ["microsoft_store_apps.csv", "winget_apps.csv", "scoop_apps.csv", "chocolatey_apps.csv"]
     found_files = []
 
-    for filename in csv_files:
+    for filename in (exporter.filename for exporter in EXPORTERS):
         filepath = output_dir / filename
         if filepath.exists():
             found_files.append(filename)